@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Windows Startup Configurator - Notifications
+------------------------------------------
+Shared toast notification helpers used by the launcher, registration
+and uninstall scripts. Toasts are shown through the WinRT notification
+manager under the AppUserModelID registered by register_task.py.
+
+Author: @kaizerslau
+License: Apache License 2.0
+"""
+
+import os
+
+# AppUserModelID the toasts are shown under
+APP_ID = "WindowsStartupConfigurator"
+# Toasts can only be displayed in an interactive desktop session
+CAN_TOAST = (
+    os.environ.get('SESSIONNAME', '').startswith(('Console', 'RDP-'))
+    and not os.environ.get('CI')
+)
+
+_TOAST_XML = (
+    '<toast><visual><binding template="ToastGeneric">'
+    '<text>{title}</text><text>{message}</text>'
+    '</binding></visual></toast>'
+)
+_notifier_singleton = None
+
+def _get_notifier():
+    """
+    Get the process-wide WinRT toast notifier, creating it on first use.
+    
+    Returns:
+        ToastNotifier: WinRT notifier shared by the whole process
+    """
+    global _notifier_singleton
+    if _notifier_singleton is None:
+        from winsdk.windows.ui.notifications import ToastNotificationManager
+        _notifier_singleton = ToastNotificationManager.create_toast_notifier(APP_ID)
+    return _notifier_singleton
+
+def show_toast(title: str, message: str) -> None:
+    """
+    Show a toast through the WinRT notification manager.
+    
+    Args:
+        title (str): Notification title
+        message (str): Notification message
+    """
+    from xml.sax.saxutils import escape
+    from winsdk.windows.data.xml.dom import XmlDocument
+    from winsdk.windows.ui.notifications import ToastNotification
+    document = XmlDocument()
+    document.load_xml(_TOAST_XML.format(title=escape(title), message=escape(message)))
+    _get_notifier().show(ToastNotification(document))
@@ -4,58 +4,107 @@
 """
 Windows Startup Configurator - Autostart Registration
 ---------------------------------------------------
-This script registers the program launcher in Windows Registry for autostart.
-It uses the Windows Registry API to create a startup entry.
+This script registers the configured programs for autostart.
+Each program gets a Task Scheduler logon task with its own delay; if that
+fails, the launcher is registered in the Windows Registry Run key instead.
 
 Author: @kaizerslau
 License: Apache License 2.0
 """
 
 import os
+import re
 import sys
 import winreg
 import time
 import subprocess
-from typing import Optional
-from win10toast import ToastNotifier
+from typing import List, Optional, Tuple
+from notifications import APP_ID, CAN_TOAST, show_toast
+from scheduled_tasks import TASK_PREFIX, connect, delete_tasks
+
+# The launcher script sits next to this one; __file__ never changes at runtime.
+# It only has to exist when the autostart entry fires, not at registration time
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_LAUNCHER_PATH = os.path.join(_SCRIPT_DIR, "start_programs.py")
+
+# Environment variables that may be substituted back into registered paths, in
+# order of preference. Under WOW64, PROGRAMFILES points at the x86 folder for this
+# process but at the 64-bit folder for Explorer, so the unambiguous names come first
+_PATH_VARIABLES = (
+    "LOCALAPPDATA", "APPDATA", "USERPROFILE",
+    "PROGRAMFILES(X86)", "ProgramW6432", "PROGRAMFILES",
+)
+
+def _to_env_path(path: str) -> str:
+    """
+    Replace a known folder prefix in a path with its environment variable.
+    
+    Args:
+        path (str): Absolute path
+    
+    Returns:
+        str: Path starting with e.g. %LOCALAPPDATA%, or the path unchanged
+    """
+    prefixes = []
+    seen = set()
+    for name in _PATH_VARIABLES:
+        value = os.environ.get(name, '').rstrip('\\/')
+        # A folder reachable through several variables uses the first one listed
+        if value and os.path.normcase(value) not in seen:
+            seen.add(os.path.normcase(value))
+            prefixes.append((value, name))
+    # Longest value first, so %LOCALAPPDATA% wins over %USERPROFILE%
+    for value, name in sorted(prefixes, key=lambda item: len(item[0]), reverse=True):
+        if (os.path.normcase(path[:len(value)]) == os.path.normcase(value)
+                and path[len(value):len(value) + 1] in ('', '\\', '/')):
+            return f"%{name}%{path[len(value):]}"
+    return path
+
+def _build_command(paths: List[str]) -> Tuple[str, int]:
+    """
+    Build a Run key command line, substituting known folder variables.
+    
+    Parts rewritten to a %VARIABLE% path are always quoted, because the
+    expanded folder (e.g. C:\\Program Files) may contain spaces even when
+    the unexpanded text does not.
+    
+    Args:
+        paths (List[str]): Absolute paths making up the command
+    
+    Returns:
+        Tuple[str, int]: The command and the registry value type to store it as
+    """
+    parts = []
+    expand = False
+    for path in paths:
+        env_path = _to_env_path(path)
+        if env_path != path:
+            # Windows paths cannot contain double quotes, so no escaping is needed
+            parts.append(f'"{env_path}"')
+            expand = True
+        else:
+            parts.append(subprocess.list2cmdline([path]))
+    return " ".join(parts), winreg.REG_EXPAND_SZ if expand else winreg.REG_SZ
 
 class AutostartManager:
-    """Manages Windows autostart registration using Registry."""
+    """Manages Windows autostart registration using Task Scheduler or Registry."""
     
     def __init__(self):
         """Initialize the autostart manager."""
-        self.notifier = ToastNotifier()
         self.startup_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
+        self.app_id_key = rf"Software\Classes\AppUserModelId\{APP_ID}"
         self.app_name = "WindowsStartupConfigurator"
+        # Command used when no executable is given: run the launcher script
+        self._command, self._value_type = _build_command([sys.executable, self._get_script_path()])
     
-    def _get_script_path(self) -> Optional[str]:
+    def _get_script_path(self) -> str:
         """
         Get the absolute path to the launcher script.
         
         Returns:
-            Optional[str]: Absolute path to the script or None if not found
+            str: Absolute path to start_programs.py
         """
-        try:
-            # Get the directory of the current script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            # Construct path to start_programs.py
-            script_path = os.path.join(script_dir, "start_programs.py")
-            
-            if not os.path.exists(script_path):
-                self._show_error(
-                    "Script not found",
-                    f"Could not find: {script_path}"
-                )
-                return None
-                
-            return script_path
-            
-        except Exception as e:
-            self._show_error(
-                "Path Error",
-                f"Failed to get script path: {str(e)}"
-            )
-            return None
+        return _LAUNCHER_PATH
     
     def _show_notification(self, title: str, message: str) -> None:
         """
@@ -65,13 +114,12 @@ class AutostartManager:
             title (str): Notification title
             message (str): Notification message
         """
-        self.notifier.show_toast(
-            title,
-            message,
-            icon_path='',
-            duration=5,
-            threaded=True
-        )
+        if not CAN_TOAST:
+            return
+        try:
+            show_toast(title, message)
+        except Exception as e:
+            print(f"Error showing notification: {e}")
     
     def _show_error(self, title: str, message: str) -> None:
         """
@@ -83,50 +131,173 @@ class AutostartManager:
         """
         self._show_notification(f"Error: {title}", message)
     
-    def register(self, executable_path: str) -> bool:
+    def _register_app_id(self) -> None:
+        """
+        Register the AppUserModelID used for toast notifications.
+        
+        Unpackaged desktop apps must register their AppUserModelID under
+        HKCU before Windows will display toasts sent with it.
+        """
+        with winreg.CreateKey(winreg.HKEY_CURRENT_USER, self.app_id_key) as key:
+            winreg.SetValueEx(
+                key,
+                "DisplayName",
+                0,
+                winreg.REG_SZ,
+                "Windows Startup Configurator"
+            )
+    
+    def register(self, executable_path: Optional[str] = None) -> bool:
         """
         Register the program for autostart in Windows Registry.
         
         Args:
-            executable_path (str): Full path to the executable to register.
+            executable_path (Optional[str]): Full path to the executable to register.
+                If None, the launcher script is registered to run with the
+                current Python interpreter.
         
         Returns:
             bool: True if registration was successful, False otherwise
         """
         try:
-            # Create the command to run the executable directly
-            command = f'"{executable_path}"'
+            # REG_EXPAND_SZ lets Windows expand %VARIABLES% when it reads the value at logon
+            if executable_path is None:
+                command, value_type = self._command, self._value_type
+            else:
+                # Create the command to run the executable directly, quoted per Windows rules
+                command, value_type = _build_command([executable_path])
             
-            # Open the registry key
-            key = winreg.OpenKey(
+            # Open the registry key; the handle is closed on exit, even on error
+            with winreg.OpenKey(
                 winreg.HKEY_CURRENT_USER,
                 self.startup_key,
                 0,
                 winreg.KEY_SET_VALUE
+            ) as key:
+                # Set the value
+                winreg.SetValueEx(
+                    key,
+                    self.app_name,
+                    0,
+                    value_type,
+                    command
+                )
+            
+            self._register_app_id()
+            
+            self._show_notification(
+                "Registration Successful",
+                "Program registered for autostart"
             )
+            return True
             
-            # Set the value
-            winreg.SetValueEx(
-                key,
-                self.app_name,
-                0,
-                winreg.REG_SZ,
-                command
+        except Exception as e:
+            self._show_error(
+                "Registration Error",
+                f"Failed to register program: {str(e)}"
             )
+            return False
+
+    def _remove_run_entry(self) -> None:
+        """Remove the Run key entry left over from registry-based autostart."""
+        try:
+            with winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self.startup_key,
+                0,
+                winreg.KEY_SET_VALUE
+            ) as key:
+                winreg.DeleteValue(key, self.app_name)
+        except FileNotFoundError:
+            pass
+    
+    def register_tasks(self, programs) -> bool:
+        """
+        Register one Task Scheduler logon task per enabled program.
+        
+        Each task starts its program directly with the program's delay set
+        on the logon trigger, so no Python process is needed at logon.
+        Tasks from a previous registration are replaced, and the registry
+        Run entry is removed so programs are not launched twice. If any task
+        fails to register, the tasks created so far are removed again so a
+        registry fallback cannot launch the same programs twice.
+        
+        Args:
+            programs (List): (name, path, delay, enabled) tuples as returned
+                by ProgramLauncher.read_config
+        
+        Returns:
+            bool: True if registration was successful, False otherwise
+        """
+        TASK_TRIGGER_LOGON = 9
+        TASK_ACTION_EXEC = 0
+        TASK_CREATE_OR_UPDATE = 6
+        TASK_LOGON_INTERACTIVE_TOKEN = 3
+        
+        folder = None
+        try:
+            scheduler, folder = connect()
+            user_id = f"{os.environ.get('USERDOMAIN', '')}\\{os.environ.get('USERNAME', '')}"
             
-            # Close the key
-            winreg.CloseKey(key)
+            delete_tasks(folder)
+            
+            for index, (name, path, delay, enabled) in enumerate(programs, start=1):
+                if not enabled:
+                    continue
+                if not path:
+                    print(f"Error: Path not specified for program '{name}'. Skipping.")
+                    continue
+                
+                definition = scheduler.NewTask(0)
+                definition.RegistrationInfo.Description = f"Launches '{name}' at logon"
+                # New tasks default to priority 7 (below normal CPU, low I/O);
+                # 4 runs programs at normal priority, as the Run key would
+                definition.Settings.Priority = 4
+                # Programs must keep running on battery and for as long as the user wants
+                definition.Settings.DisallowStartIfOnBatteries = False
+                definition.Settings.StopIfGoingOnBatteries = False
+                definition.Settings.ExecutionTimeLimit = "PT0S"
+                # Other settings keep their defaults on purpose: no idle
+                # conditions and no restart on failure for interactive programs
+                
+                trigger = definition.Triggers.Create(TASK_TRIGGER_LOGON)
+                trigger.UserId = user_id
+                trigger.Delay = f"PT{max(0, round(delay))}S"
+                
+                action = definition.Actions.Create(TASK_ACTION_EXEC)
+                action.Path = path
+                
+                # The entry index keeps names unique when programs share a name
+                # or only differ in characters that are not allowed in task names
+                task_name = re.sub(r'[\\/:*?"<>|]', '_', name)
+                folder.RegisterTaskDefinition(
+                    f"{TASK_PREFIX}{index:02d} {task_name}",
+                    definition,
+                    TASK_CREATE_OR_UPDATE,
+                    "",
+                    "",
+                    TASK_LOGON_INTERACTIVE_TOKEN
+                )
+            
+            self._remove_run_entry()
+            self._register_app_id()
             
             self._show_notification(
                 "Registration Successful",
-                "Program registered for autostart"
+                "Programs registered with Task Scheduler"
             )
             return True
             
         except Exception as e:
+            if folder is not None:
+                # Roll back partially created tasks before the caller falls back
+                try:
+                    delete_tasks(folder)
+                except Exception as cleanup_error:
+                    print(f"Error removing partially registered tasks: {cleanup_error}")
             self._show_error(
                 "Registration Error",
-                f"Failed to register program: {str(e)}"
+                f"Failed to register scheduled tasks: {str(e)}"
             )
             return False
 
@@ -135,11 +306,37 @@ def main() -> None:
     try:
         manager = AutostartManager()
 
-        # Determine the path to WindowsStartupConfigurator.exe relative to register_task.exe
-        startup_executable_path = os.path.join(os.path.dirname(sys.executable), 'WindowsStartupConfigurator.exe')
+        # Determine the paths to WindowsStartupConfigurator.exe and config.json relative to register_task.exe;
+        # when running from source, sys.executable is python.exe, so the scripts' folder is used instead
+        install_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else _SCRIPT_DIR
+        startup_executable_path = os.path.join(install_dir, 'WindowsStartupConfigurator.exe')
+        config_path = os.path.join(install_dir, 'config.json')
+
+        # Prefer launching the configured programs straight from Task Scheduler
+        from start_programs import ProgramLauncher
+        launcher = ProgramLauncher(config_path)
+        programs = launcher.read_config()
+        launcher.wait_for_notifications()
+        if programs is not None and manager.register_tasks(programs):
+            print("Programs successfully registered with Task Scheduler")
+            return
 
-        # Check if the executable exists
-        if not os.path.exists(startup_executable_path):
+        print("Task Scheduler registration failed, falling back to registry autostart")
+
+        if not getattr(sys, 'frozen', False):
+            # Running from source: register start_programs.py with this interpreter
+            if manager.register():
+                print(f"Launcher {manager._get_script_path()} successfully registered for autostart")
+            else:
+                print("Failed to register program for autostart")
+                # Keep the window open briefly so the user can see the message
+                time.sleep(5)
+            return
+
+        # Check if the executable exists by opening it rather than stat-ing it first
+        try:
+            open(startup_executable_path, 'rb').close()
+        except FileNotFoundError:
              manager._show_error(
                 "Executable not found",
                 f"Could not find: {startup_executable_path}"
@@ -155,9 +352,8 @@ def main() -> None:
             print(f"Program {startup_executable_path} successfully registered for autostart")
         else:
             print("Failed to register program for autostart")
-
-        # Keep the window open briefly to show messages
-        time.sleep(5)
+            # Keep the window open briefly so the user can see the message
+            time.sleep(5)
 
     except Exception as e:
         print(f"Fatal error: {str(e)}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Windows Startup Configurator - Scheduled Tasks
+--------------------------------------------
+Shared Task Scheduler helpers used by the registration and uninstall
+scripts, so both agree on which tasks belong to this program.
+
+Author: @kaizerslau
+License: Apache License 2.0
+"""
+
+# Prefix of the Task Scheduler tasks created for each configured program
+TASK_PREFIX = "WindowsStartupConfigurator - "
+
+def connect():
+    """
+    Connect to Task Scheduler and open the root task folder.
+    
+    Tasks live in the root folder because creating a subfolder needs
+    admin rights.
+    
+    Returns:
+        Tuple: The Schedule.Service object and its root folder
+    """
+    import win32com.client
+
+    scheduler = win32com.client.Dispatch("Schedule.Service")
+    scheduler.Connect()
+    return scheduler, scheduler.GetFolder("\\")
+
+def delete_tasks(folder) -> int:
+    """
+    Delete every task this program created in a Task Scheduler folder.
+    
+    Args:
+        folder: Task Scheduler folder object to clean up
+    
+    Returns:
+        int: Number of tasks deleted
+    """
+    TASK_ENUM_HIDDEN = 1
+    removed = 0
+    for task in list(folder.GetTasks(TASK_ENUM_HIDDEN)):
+        if task.Name.startswith(TASK_PREFIX):
+            folder.DeleteTask(task.Name, 0)
+            removed += 1
+    return removed
@@ -11,12 +11,32 @@ Author: @kaizerslau
 License: Apache License 2.0
 """
 
-import json
+import functools
+import mmap
 import time
-import subprocess
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import os
 from typing import Dict, List, Optional
-from win10toast import ToastNotifier
+import orjson
+from notifications import CAN_TOAST, show_toast
+
+@functools.lru_cache(maxsize=128)
+def _expand(path: str) -> str:
+    """
+    Expand environment variables in a path, caching the result.
+    
+    The environment does not change while the launcher runs, so paths
+    sharing the same variables are only scanned once.
+    
+    Args:
+        path (str): Path that may contain %VAR% references
+    
+    Returns:
+        str: Path with environment variables expanded
+    """
+    return os.path.expandvars(path)
 
 class ProgramLauncher:
     """Handles program launching with notifications and error handling."""
@@ -29,27 +49,56 @@ class ProgramLauncher:
             config_file (str): Path to the configuration file
         """
         self.config_file = config_file
-        self.notifier = ToastNotifier()
+        self.programs = []
+        # Toasts are shown one at a time from a single worker thread, so the
+        # launch pool's workers never call into WinRT themselves
+        self._toasts = queue.Queue()
+        if CAN_TOAST:
+            threading.Thread(target=self._toast_worker, daemon=True).start()
     
     def read_config(self):
         """
         Read and validate configuration from JSON file.
         
+        Each program entry is preprocessed once into a
+        (name, path, delay, enabled) tuple, with environment variables in the
+        path already expanded. The result is also stored in self.programs.
+        
         Returns:
-            List: List of program configurations
+            List: List of (name, path, delay, enabled) program tuples
         
         Raises:
             FileNotFoundError: If config file doesn't exist
-            json.JSONDecodeError: If config file is invalid JSON
+            orjson.JSONDecodeError: If config file is invalid JSON
         """
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('Programs', []) # Expecting a list of programs under 'Programs' key
+            with open(self.config_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    # An empty file cannot be mapped; parse it so it is reported as invalid JSON
+                    config = orjson.loads(f.read())
+                else:
+                    # Map the file and let orjson parse the pages directly, without
+                    # copying them into an intermediate bytes object first
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                            memoryview(mm) as view:
+                        config = orjson.loads(view)
+            # Expecting a list of programs under 'Programs' key; a bare list of
+            # programs, as shipped by older releases, is accepted as well
+            programs = config if isinstance(config, list) else config.get('Programs', [])
+            self.programs = [
+                (
+                    program.get('Name', 'Unknown Program'),
+                    self.get_program_path(program),
+                    float(self.get_program_delay(program)),
+                    self.is_program_enabled(program),
+                )
+                for program in programs
+            ]
+            return self.programs
         except FileNotFoundError:
             self.notify("Configuration Error", f"Configuration file '{self.config_file}' not found.")
             return None
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             self.notify("Configuration Error", f"Could not decode JSON from '{self.config_file}'. Check file format.")
             return None
         except Exception as e:
@@ -80,7 +129,7 @@ class ProgramLauncher:
         """
         path = program.get('Path')
         if path:
-            return os.path.expandvars(path)
+            return _expand(path)
         return None
     
     def get_program_delay(self, program):
@@ -91,32 +140,28 @@ class ProgramLauncher:
             program (Dict): Program configuration dictionary
         
         Returns:
-            float: Program delay in seconds
+            float: Program delay in seconds, counted from the start of the schedule
         """
         return program.get('Delay', 0) # Default delay is 0 seconds
     
-    def launch_program(self, program):
+    def launch_program(self, name, path):
         """
         Launch a single program with error handling.
         
         Args:
-            program (Dict): Program configuration dictionary
+            name (str): Program display name
+            path (Optional[str]): Program path with environment variables expanded
         """
-        name = program.get('Name', 'Unknown Program')
-        path = self.get_program_path(program)
-        delay = self.get_program_delay(program)
-
         if not path:
             print(f"Error: Path not specified for program '{name}'. Skipping.")
             self.notify("Launch Error", f"Path not specified for '{name}'. Skipping.")
             return
 
-        print(f"Waiting for {delay} seconds before launching '{name}'...")
-        time.sleep(delay)
-
         print(f"Launching '{name}' from '{path}'...")
         try:
-            subprocess.Popen([path])
+            # ShellExecute hands the program to the shell, so no handles or pipes
+            # are inherited from this process
+            os.startfile(path)
             self.notify("Program Launched", f"'{name}' launched successfully.")
         except FileNotFoundError:
             print(f"Error: Program file not found at '{path}'. Skipping.")
@@ -125,6 +170,20 @@ class ProgramLauncher:
             print(f"An unexpected error occurred while launching '{name}': {e}")
             self.notify("Launch Error", f"An unexpected error occurred while launching '{name}': {e}")
     
+    def _delayed_launch(self, name, path, deadline):
+        """
+        Wait until the scheduled time, then launch a program.
+        
+        Args:
+            name (str): Program display name
+            path (Optional[str]): Program path with environment variables expanded
+            deadline (float): time.monotonic() value at which to launch
+        """
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        self.launch_program(name, path)
+    
     def notify(self, title, message):
         """
         Display a system tray notification.
@@ -133,14 +192,31 @@ class ProgramLauncher:
             title (str): Notification title
             message (str): Notification message
         """
-        try:
-            self.notifier.show_toast(title, message, icon_path='') # Added icon_path=''
-        except Exception as e:
-            print(f"Error showing notification: {e}")
+        if not CAN_TOAST:
+            return
+        self._toasts.put((title, message))
+    
+    def _toast_worker(self):
+        """Show queued notifications in order until the process exits."""
+        while True:
+            title, message = self._toasts.get()
+            try:
+                show_toast(title, message)
+            except Exception as e:
+                print(f"Error showing notification: {e}")
+            finally:
+                self._toasts.task_done()
+    
+    def wait_for_notifications(self):
+        """Block until every queued notification has been shown."""
+        self._toasts.join()
     
     def run(self):
         """
         Launch all enabled programs with configured delays.
+        
+        Delayed programs are launched from a bounded thread pool, with each
+        delay counted from the start of the launch schedule.
         """
         print("Windows Startup Configurator: Starting program launch...")
         self.notify("Startup Configurator", "Starting program launch...")
@@ -156,13 +232,32 @@ class ProgramLauncher:
             self.notify("Startup Configurator", "No programs found in configuration.")
             return
 
-        for program in config:
-            if self.is_program_enabled(program):
-                self.launch_program(program)
-            else:
-                name = program.get('Name', 'Unknown Program')
+        # Delays are counted from the start of the schedule. Delayed programs are
+        # handed to a small thread pool in deadline order, so a worker freed by an
+        # earlier program always picks up the next one due; programs without a
+        # delay are launched together on this thread instead.
+        delayed = []
+        immediate = []
+        start = time.monotonic()
+        for name, path, delay, enabled in config:
+            if not enabled:
                 print(f"Program '{name}' is disabled. Skipping.")
                 self.notify("Startup Configurator", f"'{name}' is disabled. Skipping.")
+                continue
+
+            if delay <= 0:
+                immediate.append((name, path))
+            else:
+                delayed.append((start + delay, name, path))
+
+        delayed.sort(key=lambda item: item[0])
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(delayed)))) as executor:
+            for deadline, name, path in delayed:
+                print(f"Scheduling '{name}' to launch in {deadline - start:g} seconds...")
+                executor.submit(self._delayed_launch, name, path, deadline)
+
+            for name, path in immediate:
+                self.launch_program(name, path)
 
         print("Windows Startup Configurator: Program launch finished.")
         self.notify("Startup Configurator", "Program launch finished.")
@@ -172,6 +267,7 @@ def main() -> None:
     try:
         launcher = ProgramLauncher()
         launcher.run()
+        launcher.wait_for_notifications()
     except Exception as e:
         print(f"Fatal error: {str(e)}")
         input("Press Enter to exit...")
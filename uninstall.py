@@ -4,8 +4,8 @@
 """
 Windows Startup Configurator - Uninstaller
 ----------------------------------------
-This script removes the program from Windows autostart registry.
-It cleans up the registry entry created by register_task.py.
+This script removes the program from Windows autostart.
+It cleans up the scheduled tasks and registry entries created by register_task.py.
 
 Author: @kaizerslau
 License: Apache License 2.0
@@ -15,15 +15,15 @@ import sys
 import os
 import winreg
 from typing import Optional
-from win10toast import ToastNotifier
 import time
+from notifications import APP_ID, CAN_TOAST, show_toast
+from scheduled_tasks import connect, delete_tasks
 
 class Uninstaller:
     """Handles program uninstallation by removing registry entries."""
     
     def __init__(self):
         """Initialize the uninstaller."""
-        self.notifier = ToastNotifier()
         self.app_name = "WindowsStartupConfigurator"
     
     def notify(self, title, message):
@@ -34,15 +34,21 @@ class Uninstaller:
             title (str): Notification title
             message (str): Notification message
         """
+        if not CAN_TOAST:
+            return
         try:
-            self.notifier.show_toast(title, message, icon_path='')
+            show_toast(title, message)
         except Exception as e:
             print(f"Error showing notification: {e}")
     
-    def unregister_autostart(self):
+    def unregister_autostart(self, tasks_removed=False):
         """
         Remove the program from Windows autostart.
         
+        Args:
+            tasks_removed (bool): Whether scheduled tasks were already removed,
+                in which case a missing registry entry is not reported
+        
         Returns:
             bool: True if uninstallation was successful, False otherwise
         """
@@ -50,33 +56,80 @@ class Uninstaller:
         run_key = r"Software\Microsoft\Windows\CurrentVersion\Run"
 
         try:
-            # Open the registry key with write access
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, run_key, 0, winreg.KEY_SET_VALUE)
-
-            # Delete the registry value
-            winreg.DeleteValue(key, self.app_name)
-
-            # Close the registry key
-            winreg.CloseKey(key)
+            # Open the registry key with write access; the handle is closed on exit, even on error
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, run_key, 0, winreg.KEY_SET_VALUE) as key:
+                # Delete the registry value
+                winreg.DeleteValue(key, self.app_name)
 
             print(f"Successfully unregistered '{self.app_name}' from autostart.")
             self.notify("Autostart Uninstallation", f"'{self.app_name}' unregistered successfully from autostart.")
+            return True
 
         except FileNotFoundError:
+            if tasks_removed:
+                return True
             print(f"Autostart entry for '{self.app_name}' not found in registry. Nothing to uninstall.")
             self.notify("Autostart Uninstallation", f"Autostart entry for '{self.app_name}' not found. Nothing to uninstall.")
+            return True
         except Exception as e:
             print(f"Error unregistering from autostart: {e}")
             self.notify("Autostart Uninstallation", f"Failed to unregister '{self.app_name}' from autostart: {e}")
+            return False
+    
+    def unregister_tasks(self):
+        """
+        Remove the Task Scheduler logon tasks created for configured programs.
+        
+        Returns:
+            Optional[int]: Number of scheduled tasks removed, or None if removal failed
+        """
+        try:
+            _, folder = connect()
+            removed = delete_tasks(folder)
+
+            if removed:
+                print(f"Removed {removed} scheduled task(s) for '{self.app_name}'.")
+                self.notify("Autostart Uninstallation", f"Removed {removed} scheduled task(s).")
+            return removed
+
+        except Exception as e:
+            print(f"Error removing scheduled tasks: {e}")
+            self.notify("Autostart Uninstallation", f"Failed to remove scheduled tasks: {e}")
+            return None
+    
+    def unregister_app_id(self):
+        """
+        Remove the AppUserModelID registered for toast notifications.
+        
+        Returns:
+            bool: True if the registration was removed or did not exist, False otherwise
+        """
+        app_id_key = rf"Software\Classes\AppUserModelId\{APP_ID}"
+
+        try:
+            winreg.DeleteKey(winreg.HKEY_CURRENT_USER, app_id_key)
+            print(f"Removed notification registration for '{APP_ID}'.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing notification registration: {e}")
+            return False
+        return True
 
 def main() -> None:
     """Main entry point of the script."""
     try:
         uninstaller = Uninstaller()
-        uninstaller.unregister_autostart()
+        tasks_removed = uninstaller.unregister_tasks()
+        succeeded = uninstaller.unregister_autostart(tasks_removed=bool(tasks_removed))
+        # Done last so the uninstall toast above is still shown under the app's name
+        succeeded = uninstaller.unregister_app_id() and succeeded
+        if tasks_removed is None or not succeeded:
+            # Keep the window open briefly so the user can see the errors
+            time.sleep(5)
     except Exception as e:
         print(f"Fatal error: {str(e)}")
-    finally:
+        # Keep the window open briefly so the user can see the message
         time.sleep(5)
 
 if __name__ == "__main__":